@@ -0,0 +1,57 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional (see requirements-batch.txt); without it the batched
+    # calculation runs as plain Python
+    def njit(**kwargs):
+        return lambda func: func
+
+def _calc_wetbulb(temp, rh):
+    # the formula from calc_wetbulb written with numpy ufuncs, so the same 
+    # code runs on arrays and scalars, with or without numba
+    term1 = temp * np.arctan(0.151977 * np.sqrt(rh + 8.313659))
+    term2 = np.arctan(temp + rh)
+    term3 = np.arctan(rh - 1.676331)
+    term4 = 0.00391838 * rh * np.sqrt(rh) * np.arctan(0.023101 * rh)
+    return term1 + term2 - term3 + term4 - 4.686035
+
+_calc_wetbulb_jit = njit(fastmath=True, cache=True)(_calc_wetbulb)
+
+@njit(fastmath=True, cache=True)
+def calc_wetbulb_vec(temp, rh):
+    """
+        Batched version of calc_wetbulb for a series of readings, e.g. when 
+        plotting the Wet-Bulb temperature over a period of time. Compiled with 
+        numba so the calculation runs without interpreter overhead.
+
+        Params:
+            temp (numpy.ndarray): The temperatures.
+            rh (numpy.ndarray): The relative humidities, of the same length as
+            temp.
+
+        Returns:
+            (numpy.ndarray): The Wet-Bulb temperature for each pair of 
+            readings.
+    """
+    return _calc_wetbulb_jit(temp, rh)
+
+def calc_wetbulb_np(temp, rh):
+    """
+        Vectorised version of calc_wetbulb using numpy ufuncs, e.g. to 
+        calculate the Wet-Bulb temperature for each station's readings in one
+        call instead of averaging the readings first.
+
+        Params:
+            temp (numpy.ndarray): The temperatures.
+            rh (numpy.ndarray): The relative humidities, of the same shape as
+            temp.
+
+        Returns:
+            (numpy.ndarray): The Wet-Bulb temperature for each pair of 
+            readings.
+    """
+    temp = np.asarray(temp, dtype=np.float64)
+    rh = np.asarray(rh, dtype=np.float64)
+    return _calc_wetbulb(temp, rh)
@@ -1,9 +1,10 @@
 import streamlit as st
-import requests
-import numpy as np
+import httpx
 import math
+from statistics import fmean
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt 
-import pytz
+from zoneinfo import ZoneInfo
 from enum import Enum
 
 st.set_page_config(layout="wide")
@@ -13,8 +14,10 @@ THRESHOLD_WARNING = 31
 
 URL_TEMPERATURE = "https://api.data.gov.sg/v1/environment/air-temperature"
 URL_HUMIDITY = "https://api.data.gov.sg/v1/environment/relative-humidity"
+REQUEST_TIMEOUT = 5
+TIMEZONE = ZoneInfo("Asia/Singapore")
 
-status_message = [
+status_message = (
     (
         "Current environment might be dangerous.", "🚨",
         """
@@ -39,7 +42,40 @@ status_message = [
             - Take shelter in between prolonged outdoor activity.
         """
     )
-]
+)
+
+INFO_ABOUT = """
+        WBT is the lowest temperature that an environment can take after 
+        adjusting for evaporation. Since our sweat evaporates, it can be used 
+        as a measure of how cool the air surrounding our body can get after 
+        accounting for sweating. 
+
+        Evaporation, and therefore sweat evaporation, is higher when relative 
+        humidity is low. This means that an area which is hot but dry might 
+        be safer than an area that might be cooler but very humid because 
+        people in the hot, dry area can cool off better by sweating.
+
+        At high WBTs, the body finds it hard to avoid overheating, increasing 
+        the risk of 
+        [heat-related illnesses](http://www.weather.gov.sg/learn-heat-stress/).
+        """
+
+INFO_SOURCES = """
+        Information on WBT:
+        - [Meteorological Service Singapore (MSS)](http://www.weather.gov.sg/heat-stress/)
+        - [*Why you need to worry about the 'wet-bulb temperature'*, The Guardian](https://www.theguardian.com/science/2022/jul/31/why-you-need-to-worry-about-the-wet-bulb-temperature)
+
+        Real-time data on air temperature and humidity in Singapore:
+
+        - [Air Temperature across Singapore](https://beta.data.gov.sg/datasets/d_5b1a6d3688427dd41e2c234fe42fb863/view) from the National Environment Agency, via data.gov under the Open Data License.
+        - [Relative Humidity across Singapore](https://beta.data.gov.sg/datasets/d_a64cbc762227d00a5a7fc7fc7fdb762b/view) from the National Environment Agency, via data.gov under the Open Data License.
+
+        Formula used to calculate WBT:
+
+        Stull, R. (2011). Wet-Bulb Temperature from Relative Humidity and Air
+        Temperature. Journal of Applied Meteorology and Climatology, 50(11), 
+        2267-2269. https://doi.org/10.1175/JAMC-D-11-0143.1
+        """
 
 class Status(Enum):
     DANGER = 0
@@ -47,12 +83,31 @@ class Status(Enum):
     SAFE = 2
     NONE = 3
 
-@st.cache_data
+# the Streamlit alert used to show each status, along with its message, icon 
+# and actions
+status_display = {
+    Status.DANGER: (st.error, *status_message[Status.DANGER.value]),
+    Status.WARNING: (st.warning, *status_message[Status.WARNING.value]),
+    Status.SAFE: (st.success, *status_message[Status.SAFE.value]),
+}
+
 def display_intro():
     st.title("Live Wet-Bulb temperature in Singapore")
     st.info("DISCLAIMER: this site does not substitute professional medical advice and is for educational purposes only.")
 
-@st.cache_data
+@st.cache_resource
+def get_session():
+    """
+        Creates a single HTTP/2 client shared across reruns so that calls to 
+        data.gov reuse one connection, with concurrent requests multiplexed
+        over it instead of opening a new connection for each.
+
+        Returns:
+            (httpx.Client): The shared client.
+    """
+    return httpx.Client(http2=True, timeout=REQUEST_TIMEOUT)
+
+@st.cache_data(ttl=60, show_spinner=False)
 def get_temp_rh(for_datetime):
     """
         Calls the public data.gov API to get the current temperature and 
@@ -67,39 +122,49 @@ def get_temp_rh(for_datetime):
             (dict): The current data on relative humidity.
     """
     params = {"date_time": for_datetime}
-    
-    res_temp = requests.get(URL_TEMPERATURE, params=params).json()
-
-    res_rh = requests.get(URL_HUMIDITY, params=params).json()
+    session = get_session()
+
+    # both calls are independent, so issue them together
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_temp = executor.submit(session.get, URL_TEMPERATURE, 
+                                      params=params)
+        future_rh = executor.submit(session.get, URL_HUMIDITY, params=params)
+        res_temp = future_temp.result().json()
+        res_rh = future_rh.result().json()
     
     return res_temp, res_rh
 
-@st.cache_data
 def agg_values(temp, rh):
-    avg_temp = np.mean([i["value"] for i in 
-                        temp.get("items", -1)[0]["readings"]])
+    readings_temp = temp.get("items", -1)[0]["readings"]
+    readings_rh = rh.get("items", -1)[0]["readings"]
+
+    # NEA occasionally returns no readings for a timestamp
+    if not readings_temp or not readings_rh:
+        return None, None
+
+    avg_temp = fmean(i["value"] for i in readings_temp)
 
-    avg_rh = np.mean([i["value"] for i in rh.get("items", -1)[0]["readings"]])
+    avg_rh = fmean(i["value"] for i in readings_rh)
 
     return avg_temp, avg_rh
 
-@st.cache_data
 def calc_wetbulb(temp, rh):
     """
         Uses the formula from the American Meteorological Society journal to 
         calculate the Wet-Bulb temperatre.
 
         Params:
-            temp (numpy.float64): The average temperature.
-            rh (numpy.float64): The average relative humidity.
+            temp (float): The average temperature.
+            rh (float): The average relative humidity.
     """
-    return (temp * math.atan(0.151977 * math.sqrt(rh + 8.313659))) \
-        + math.atan(temp + rh) \
-        - math.atan(rh - 1.676331) \
-        + (0.00391838 * (math.sqrt(rh) ** 3)) * math.atan(0.023101 * rh) \
-        - 4.686035
+    # rh^(3/2) is computed as rh * sqrt(rh) to avoid a float power
+    sqrt_rh = math.sqrt(rh)
+    term1 = temp * math.atan(0.151977 * math.sqrt(rh + 8.313659))
+    term2 = math.atan(temp + rh)
+    term3 = math.atan(rh - 1.676331)
+    term4 = 0.00391838 * rh * sqrt_rh * math.atan(0.023101 * rh)
+    return term1 + term2 - term3 + term4 - 4.686035
 
-@st.cache_data
 def check_status(wb_temp):
     """
         Evaluates if the current Wet-Bulb temperature is dangerous using 
@@ -107,13 +172,13 @@ def check_status(wb_temp):
         results.
 
         Params:
-            wb_temp (numpy.float64): The current Wet-Bulb temperature
+            wb_temp (float): The current Wet-Bulb temperature
         
         Returns:
             (Status): The evaluated status of the current Wet-Bulb 
             temperature. Corresponds to the Status enum defined above.
-            (tuple): The status message, icon and actions to display to the user
-            based on the current status.
+            (tuple): The Streamlit alert function, status message, icon and 
+            actions to display to the user based on the current status.
     """
     status = Status.NONE
     if wb_temp >= THRESHOLD_DANGER:
@@ -122,18 +187,17 @@ def check_status(wb_temp):
         status = Status.WARNING
     else:
         status = Status.SAFE
-    return status, status_message[status.value]
+    return status, status_display[status]
 
-@st.cache_data
 def display_output(temp, rh, wetbulb):
     """
         Presents a dashboard of the current temperature, humidity and Wet-Bulb
         temperature with actionable insights on how to interpret the results.
 
         Params:
-            temp (numpy.float64): The average temperature.
-            rh (numpy.float64): The average relative humidity.
-            wetbulb (numpy.float64): The current Wet-Bulb temperature.
+            temp (float): The average temperature.
+            rh (float): The average relative humidity.
+            wetbulb (float): The current Wet-Bulb temperature.
     """
     left, centre, right = st.columns(3)
 
@@ -149,74 +213,60 @@ def display_output(temp, rh, wetbulb):
         st.subheader("Wet-Bulb Temperature:")
         st.header(f"{round(wetbulb, 2)} °C")
 
-    status, msg = check_status(wetbulb)
+    _, (alert, msg, icon, actions) = check_status(wetbulb)
     with right.container(height=356, border=True):
         st.subheader("What this means:")
-        if status == Status.DANGER:
-            st.error(msg[0], icon=msg[1])
-        elif status == Status.WARNING:
-            st.warning(msg[0], icon=msg[1])
-        elif status == Status.SAFE:
-            st.success(msg[0], icon=msg[1])
-        st.markdown(msg[2])
-
-@st.cache_data
+        alert(msg, icon=icon)
+        st.markdown(actions)
+
 def display_info():
     st.header("About Wet-Bulb temperature (WBT)")
-    st.markdown(
-        """
-        WBT is the lowest temperature that an environment can take after 
-        adjusting for evaporation. Since our sweat evaporates, it can be used 
-        as a measure of how cool the air surrounding our body can get after 
-        accounting for sweating. 
-
-        Evaporation, and therefore sweat evaporation, is higher when relative 
-        humidity is low. This means that an area which is hot but dry might 
-        be safer than an area that might be cooler but very humid because 
-        people in the hot, dry area can cool off better by sweating.
-
-        At high WBTs, the body finds it hard to avoid overheating, increasing 
-        the risk of 
-        [heat-related illnesses](http://www.weather.gov.sg/learn-heat-stress/).
-        """
-    )
+    st.markdown(INFO_ABOUT)
 
     st.header("Sources and further reading")
-    st.markdown(
-        """
-        Information on WBT:
-        - [Meteorological Service Singapore (MSS)](http://www.weather.gov.sg/heat-stress/)
-        - [*Why you need to worry about the 'wet-bulb temperature'*, The Guardian](https://www.theguardian.com/science/2022/jul/31/why-you-need-to-worry-about-the-wet-bulb-temperature)
-
-        Real-time data on air temperature and humidity in Singapore:
-        
-        - [Air Temperature across Singapore](https://beta.data.gov.sg/datasets/d_5b1a6d3688427dd41e2c234fe42fb863/view) from the National Environment Agency, via data.gov under the Open Data License.
-        - [Relative Humidity across Singapore](https://beta.data.gov.sg/datasets/d_a64cbc762227d00a5a7fc7fc7fdb762b/view) from the National Environment Agency, via data.gov under the Open Data License.
-
-        Formula used to calculate WBT:
-
-        Stull, R. (2011). Wet-Bulb Temperature from Relative Humidity and Air
-        Temperature. Journal of Applied Meteorology and Climatology, 50(11), 
-        2267-2269. https://doi.org/10.1175/JAMC-D-11-0143.1
-        """
-    )
-
-if __name__ == "__main__":
-    display_intro()
+    st.markdown(INFO_SOURCES)
 
+@st.experimental_fragment
+def display_dashboard():
+    """
+        Gets the latest readings and presents them as a dashboard with a 
+        button to refresh them. Runs as a fragment so that refreshing only 
+        reruns the dashboard and not the static sections of the page.
+    """
     # call NEA's API to get the temperature and relative humidity
-    tz = pytz.timezone("Asia/Singapore")
-    live_datetime = dt.now(tz=tz).strftime("%Y-%m-%dT%H:%M:%S")
-    temp, rh = get_temp_rh(live_datetime)
-
-    # aggregate the results and calculate WBT
-    avg_temp, avg_rh = agg_values(temp, rh)
+    # NEA updates its readings every minute, so round down to the minute to 
+    # let reruns within the same minute reuse the cached response
+    # the API expects a local timestamp without the UTC offset
+    live_datetime = dt.now(tz=TIMEZONE) \
+        .replace(second=0, microsecond=0, tzinfo=None) \
+        .isoformat(timespec="seconds")
+
+    # aggregate the results only when there is new data, otherwise reuse the
+    # averages from the previous run in this session
+    if st.session_state.get("readings_datetime") != live_datetime:
+        temp, rh = get_temp_rh(live_datetime)
+        st.session_state["avg_readings"] = agg_values(temp, rh)
+        st.session_state["readings_datetime"] = live_datetime
+    avg_temp, avg_rh = st.session_state["avg_readings"]
+
+    if avg_temp is None:
+        st.warning("No temperature or humidity readings are available right now. Please try again later.")
+        st.button("Refresh")
+        return
+
+    # calculate WBT
     wetbulb = calc_wetbulb(avg_temp, avg_rh)
 
     # show the results as a dashboard
     display_output(avg_temp, avg_rh, wetbulb)
     st.button("Refresh")
 
+if __name__ == "__main__":
+    display_intro()
+
+    # show the live readings, refreshed independently of the rest of the page
+    display_dashboard()
+
     # show information and sources
     display_info()
 
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from wetbulb_warnings import calc_wetbulb
+from wetbulb_batch import calc_wetbulb_np, calc_wetbulb_vec
+
+TEMPS = [20.0, 26.5, 31.0, 34.2, 38.0]
+RHS = [50.0, 95.0, 75.0, 60.5, 30.0]
+
+def test_calc_wetbulb_vec_matches_scalar():
+    expected = [calc_wetbulb(t, rh) for t, rh in zip(TEMPS, RHS)]
+    result = calc_wetbulb_vec(np.array(TEMPS), np.array(RHS))
+    assert result == pytest.approx(expected)
+
+def test_calc_wetbulb_np_matches_scalar():
+    expected = [calc_wetbulb(t, rh) for t, rh in zip(TEMPS, RHS)]
+    assert calc_wetbulb_np(TEMPS, RHS) == pytest.approx(expected)
+    assert calc_wetbulb_np(TEMPS[0], RHS[0]) == pytest.approx(expected[0])